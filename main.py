@@ -1,19 +1,24 @@
 import argparse
 import csv
+import io
 import json
 import logging
 import logging.config
 import logging.handlers as handlers
+import multiprocessing
+import multiprocessing.queues
 import random
 import schedule
 import re
 import sys
-import traceback
 import subprocess
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from enum import Enum, auto
-from pyvirtualdisplay import Display
+
+import urllib3
+from selenium.common import InvalidSessionIdException, SessionNotCreatedException
 
 from src import (
     Browser,
@@ -26,122 +31,195 @@ from src import (
 from src.activities import Activities
 from src.browser import RemainingSearches
 from src.loggingColoredFormatter import ColoredFormatter
-from src.utils import Utils, CONFIG, sendNotification, getProjectRoot, formatNumber
+from src.utils import (
+    Utils,
+    CONFIG,
+    sendNotification,
+    getProjectRoot,
+    formatNumber,
+    makeRequestsSession,
+)
 
 import requests
 import os
-import wget
-import zipfile
+from pathlib import Path
+
+CHROMEDRIVER_VERSION = "112.0.5615.49"
+CHROMEDRIVER_VERSION_PATTERN = re.compile(r"ChromeDriver ([\d.]+)")
+LOGS_DIRECTORY = getProjectRoot() / "logs"
+POINTS_CSV_PATH = LOGS_DIRECTORY / "points_data.csv"
+PREVIOUS_POINTS_PATH = LOGS_DIRECTORY / "previous_points_data.json"
+ACCOUNTS_PATH = getProjectRoot() / "accounts.json"
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+ACCOUNT_ATTEMPTS = 2
+ACCOUNT_RETRY_DELAY_IN_SECONDS = 30
+# only failures of the browser or the connection are worth a retry, a broken page or
+# selector (TimeoutException, NoSuchElementException, ...) would just fail again
+TRANSIENT_ACCOUNT_ERRORS = (
+    InvalidSessionIdException,  # the browser or driver died mid-run
+    SessionNotCreatedException,  # chrome failed to start
+    urllib3.exceptions.HTTPError,  # lost the connection to the driver
+    requests.ConnectionError,
+    ConnectionError,
+)
 
-def downloadWebDriver():
-    # get the latest chrome driver version number
-    # url = 'https://chromedriver.storage.googleapis.com/LATEST_RELEASE'
-    # response = requests.get(url)
-    # version_number = response.text
+
+def isWebDriverUpToDate(version_number: str) -> bool:
+    """Checks whether the local chrome driver binary reports the given version."""
+    if not Path("chromedriver").exists():
+        return False
+    try:
+        output = subprocess.run(
+            ["./chromedriver", "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return False
+    match = CHROMEDRIVER_VERSION_PATTERN.match(output)
+    return match is not None and match.group(1) == version_number
+
+
+def fetchWebDriver(version_number: str):
+    import zipfile
 
     # build the donwload url
-    # download_url = "https://chromedriver.storage.googleapis.com/" + version_number +"/chromedriver_linux64.zip"
-    download_url = "https://chromedriver.storage.googleapis.com/112.0.5615.49/chromedriver_linux64.zip"
-    # download the zip file using the url built above
-    latest_driver_zip = wget.download(download_url,'chromedriver.zip')
-
-    # extract the zip file
-    with zipfile.ZipFile(latest_driver_zip, 'r') as zip_ref:
-        zip_ref.extractall() # you can specify the destination folder path here
-    # delete the zip file downloaded above
-    os.remove(latest_driver_zip)
+    download_url = "https://chromedriver.storage.googleapis.com/" + version_number +"/chromedriver_linux64.zip"
+    # keep the zip in memory, only the driver binary gets written to disk
+    response = makeRequestsSession().get(download_url)
+    response.raise_for_status()
+
+    # extract only the driver binary, the license file isn't needed
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zip_ref:
+        zip_ref.extract("chromedriver")
+    # zipfile doesn't restore the executable bit
+    os.chmod("chromedriver", 0o755)
+
+
+def downloadWebDriver():
+    # skip the download when the pinned chrome driver is already in place
+    if isWebDriverUpToDate(CHROMEDRIVER_VERSION):
+        logging.info(f"[DRIVER] ChromeDriver {CHROMEDRIVER_VERSION} is up to date")
+        return
+    fetchWebDriver(CHROMEDRIVER_VERSION)
     
     
 def downloadWebDriverv2():
     # get the latest chrome driver version number
     url = 'https://chromedriver.storage.googleapis.com/LATEST_RELEASE'
-    response = requests.get(url)
+    response = makeRequestsSession().get(url)
     version_number = response.text
 
-    # build the donwload url
-    download_url = "https://chromedriver.storage.googleapis.com/" + version_number +"/chromedriver_linux64.zip"
-    # download the zip file using the url built above
-    latest_driver_zip = wget.download(download_url,'chromedriver.zip')
-
-    # extract the zip file
-    with zipfile.ZipFile(latest_driver_zip, 'r') as zip_ref:
-        zip_ref.extractall() # you can specify the destination folder path here
-    # delete the zip file downloaded above
-    os.remove(latest_driver_zip)
+    if isWebDriverUpToDate(version_number):
+        logging.info(f"[DRIVER] ChromeDriver {version_number} is up to date")
+        return
+    fetchWebDriver(version_number)
 
 
 def main():
     args = argumentParser()
     Utils.args = args
-    setupLogging()
+    # spawn rather than fork, forking while the log listener and queue feeder threads
+    # are running isn't safe and fork stops being the default in Python 3.14
+    mpContext = multiprocessing.get_context("spawn")
+    logQueue = setupLogging(mpContext)
     loadedAccounts = setupAccounts()
 
     # Load previous day's points data
     previous_points_data = load_previous_points_data()
+    daily_points: list[tuple[int, int]] = []
 
-    for currentAccount in loadedAccounts:
-        try:
-            earned_points = executeBot(currentAccount, args)
-        except Exception as e1:
-            logging.error("", exc_info=True)
-            sendNotification(
-                f"⚠️ Error executing {currentAccount.username}, please check the log",
-                traceback.format_exc(),
-                e1,
-            )
-            continue
-        previous_points = previous_points_data.get(currentAccount.username, 0)
-
-        # Calculate the difference in points from the prior day
-        points_difference = earned_points - previous_points
-
-        # Append the daily points and points difference to CSV and Excel
-        log_daily_points_to_csv(earned_points, points_difference)
-
-        # Update the previous day's points data
-        previous_points_data[currentAccount.username] = earned_points
-
-        logging.info(
-            f"[POINTS] Data for '{currentAccount.username}' appended to the file."
-        )
+    # patch the driver here so the workers find it patched instead of all patching it at once
+    Browser.patchDriver()
+    # worker records go through the parent's handlers for as long as the pool runs
+    listener = handlers.QueueListener(
+        logQueue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(args.workers, len(loadedAccounts))),
+            mp_context=mpContext,
+            initializer=initWorker,
+            initargs=(args, logQueue),
+        ) as executor:
+            futures = {
+                executor.submit(executeAccount, account, args): account
+                for account in loadedAccounts
+            }
+            for future in as_completed(futures):
+                currentAccount = futures[future]
+                try:
+                    earned_points = future.result()
+                except Exception as e1:
+                    logging.error("", exc_info=True)
+                    sendNotification(
+                        f"⚠️ Error executing {currentAccount.username}, please check the log",
+                        e=e1,
+                    )
+                    continue
+                previous_points = previous_points_data.get(currentAccount.username, 0)
+
+                # Calculate the difference in points from the prior day
+                points_difference = earned_points - previous_points
+
+                # Queue the daily points and points difference for the CSV
+                daily_points.append((earned_points, points_difference))
+
+                # Update the previous day's points data
+                previous_points_data[currentAccount.username] = earned_points
+
+                logging.info(f"[POINTS] Data for '{currentAccount.username}' recorded.")
+    finally:
+        # stopping the listener handles whatever the workers logged before the pool shut down
+        listener.stop()
+
+    # Append every account's daily points to the CSV in a single write
+    log_daily_points_to_csv(daily_points)
+    logging.info("[POINTS] Daily points appended to the file.")
 
     # Save the current day's points data for the next day in the "logs" folder
     save_previous_points_data(previous_points_data)
     logging.info("[POINTS] Data saved for the next day.")
 
 
-def log_daily_points_to_csv(earned_points, points_difference):
-    logs_directory = getProjectRoot() / "logs"
-    csv_filename = logs_directory / "points_data.csv"
+def initWorker(args: argparse.Namespace, logQueue: multiprocessing.queues.Queue):
+    """Prepares a worker process to run executeBot for one or more accounts."""
+    Utils.args = args
+    root = logging.getLogger()
+    if not root.handlers:
+        # spawned workers don't inherit the parent's logging setup, forward to it
+        disableExistingLoggers()
+        root.setLevel(logging.getLevelName(CONFIG.get("logging").get("level").upper()))
+        root.addHandler(handlers.QueueHandler(logQueue))
+
+
+def log_daily_points_to_csv(daily_points: list[tuple[int, int]]):
+    if not daily_points:
+        return
 
-    # Create a new row with the date, daily points, and points difference
+    # Create a new row with the date, daily points, and points difference per account
     date = datetime.now().strftime("%Y-%m-%d")
-    new_row = {
-        "Date": date,
-        "Earned Points": earned_points,
-        "Points Difference": points_difference,
-    }
+    new_rows = [
+        {
+            "Date": date,
+            "Earned Points": earned_points,
+            "Points Difference": points_difference,
+        }
+        for earned_points, points_difference in daily_points
+    ]
 
     fieldnames = ["Date", "Earned Points", "Points Difference"]
-    is_new_file = not csv_filename.exists()
+    is_new_file = not POINTS_CSV_PATH.exists()
 
-    with open(csv_filename, mode="a", newline="") as file:
+    with open(POINTS_CSV_PATH, mode="a", newline="") as file:
         writer = csv.DictWriter(file, fieldnames=fieldnames)
 
         if is_new_file:
             writer.writeheader()
 
-        writer.writerow(new_row)
+        writer.writerows(new_rows)
 
 
-def setupLogging():
-    _format = "%(asctime)s [%(levelname)s] %(message)s"
-    terminalHandler = logging.StreamHandler(sys.stdout)
-    terminalHandler.setFormatter(ColoredFormatter(_format))
-
-    logs_directory = getProjectRoot() / "logs"
-    logs_directory.mkdir(parents=True, exist_ok=True)
-
+def disableExistingLoggers():
     # so only our code is logged if level=logging.DEBUG or finer
     logging.config.dictConfig(
         {
@@ -149,20 +227,37 @@ def setupLogging():
             "disable_existing_loggers": True,
         }
     )
-    logging.basicConfig(
-        level=logging.getLevelName(CONFIG.get("logging").get("level").upper()),
-        format=_format,
-        handlers=[
-            handlers.TimedRotatingFileHandler(
-                logs_directory / "activity.log",
-                when="midnight",
-                interval=1,
-                backupCount=2,
-                encoding="utf-8",
-            ),
-            terminalHandler,
-        ],
+
+
+def setupLogging(
+    context: multiprocessing.context.BaseContext,
+) -> multiprocessing.queues.Queue:
+    """Configures the root logger and returns a queue pool workers can forward their records to."""
+    root = logging.getLogger()
+    if root.handlers:
+        # already configured by a previous scheduled run
+        return context.Queue()
+
+    disableExistingLoggers()
+
+    _format = "%(asctime)s [%(levelname)s] %(message)s"
+    terminalHandler = logging.StreamHandler(sys.stdout)
+    terminalHandler.setFormatter(ColoredFormatter(_format))
+
+    LOGS_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    fileHandler = handlers.TimedRotatingFileHandler(
+        LOGS_DIRECTORY / "activity.log",
+        when="midnight",
+        interval=1,
+        backupCount=2,
+        encoding="utf-8",
     )
+    fileHandler.setFormatter(logging.Formatter(_format))
+
+    root.setLevel(logging.getLevelName(CONFIG.get("logging").get("level").upper()))
+    root.addHandler(fileHandler)
+    root.addHandler(terminalHandler)
+    return context.Queue()
 
 
 def argumentParser() -> argparse.Namespace:
@@ -209,20 +304,21 @@ def argumentParser() -> argparse.Namespace:
         default=None,
         help="Optional: Set to only search in either desktop or mobile (ex: 'desktop' or 'mobile')",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Optional: Number of accounts to run in parallel (ex: 2)",
+    )
     return parser.parse_args()
 
 
 def setupAccounts() -> list[Account]:
     """Sets up and validates a list of accounts loaded from 'accounts.json'."""
 
-    def validEmail(email: str) -> bool:
-        """Validate Email."""
-        pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-        return bool(re.match(pattern, email))
-
-    accountPath = getProjectRoot() / "accounts.json"
-    if not accountPath.exists():
-        accountPath.write_text(
+    if not ACCOUNTS_PATH.exists():
+        ACCOUNTS_PATH.write_text(
             json.dumps(
                 [{"username": "Your Email", "password": "Your Password"}], indent=4
             ),
@@ -235,9 +331,9 @@ def setupAccounts() -> list[Account]:
         logging.warning(noAccountsNotice)
         exit(1)
     loadedAccounts: list[Account] = []
-    for rawAccount in json.loads(accountPath.read_text(encoding="utf-8")):
+    for rawAccount in json.loads(ACCOUNTS_PATH.read_bytes()):
         account: Account = Account(**rawAccount)
-        if not validEmail(account.username):
+        if not EMAIL_PATTERN.match(account.username):
             logging.warning(
                 f"[CREDENTIALS] Invalid email: {account.username}, skipping this account"
             )
@@ -266,10 +362,37 @@ class AppriseSummary(Enum):
     """
 
 
-def executeBot(currentAccount: Account, args: argparse.Namespace):
+APPRISE_SUMMARY = AppriseSummary[CONFIG.get("apprise").get("summary")]
+
+
+def executeAccount(currentAccount: Account, args: argparse.Namespace) -> int:
+    """Runs the bot for an account, retrying once after a transient driver or network failure."""
+    # executeBot records the points it started with here, so a retry still reports
+    # what the failed attempt earned
+    runState: dict[str, int] = {}
+    for attempt in range(1, ACCOUNT_ATTEMPTS + 1):
+        try:
+            return executeBot(currentAccount, args, runState)
+        except TRANSIENT_ACCOUNT_ERRORS:
+            if attempt == ACCOUNT_ATTEMPTS:
+                raise
+            logging.warning(
+                f"[BOT] Attempt {attempt}/{ACCOUNT_ATTEMPTS} for '{currentAccount.username}' failed, retrying in {ACCOUNT_RETRY_DELAY_IN_SECONDS}s",
+                exc_info=True,
+            )
+            time.sleep(ACCOUNT_RETRY_DELAY_IN_SECONDS)
+
+
+def executeBot(
+    currentAccount: Account,
+    args: argparse.Namespace,
+    runState: dict[str, int] | None = None,
+):
     logging.info(f"********************{currentAccount.username}********************")
 
-    startingPoints: int | None = None
+    if runState is None:
+        runState = {}
+    startingPoints: int | None = runState.get("startingPoints")
     accountPoints: int
     remainingSearches: RemainingSearches
     goalTitle: str
@@ -279,7 +402,8 @@ def executeBot(currentAccount: Account, args: argparse.Namespace):
         with Browser(mobile=False, account=currentAccount, args=args) as desktopBrowser:
             utils = desktopBrowser.utils
             Login(desktopBrowser, args).login()
-            startingPoints = utils.getAccountPoints()
+            if startingPoints is None:
+                startingPoints = runState["startingPoints"] = utils.getAccountPoints()
             logging.info(
                 f"[POINTS] You have {formatNumber(startingPoints)} points on your account"
             )
@@ -290,76 +414,75 @@ def executeBot(currentAccount: Account, args: argparse.Namespace):
             with Searches(desktopBrowser) as searches:
                 searches.bingSearches()
 
-            goalPoints = utils.getGoalPoints()
-            goalTitle = utils.getGoalTitle()
+            # when the mobile run follows it fetches the final totals, no need to do it twice
+            if args.searchtype == "desktop":
+                dashboard = utils.getDashboardData()
+                goalPoints = utils.getGoalPoints(dashboard)
+                goalTitle = utils.getGoalTitle(dashboard)
 
-            remainingSearches = desktopBrowser.getRemainingSearches(
-                desktopAndMobile=True
-            )
-            accountPoints = utils.getAccountPoints()
+                remainingSearches = desktopBrowser.getRemainingSearches(
+                    desktopAndMobile=True, dashboard=dashboard
+                )
+                accountPoints = utils.getAccountPoints(dashboard)
 
     if args.searchtype in ("mobile", None):
         with Browser(mobile=True, account=currentAccount, args=args) as mobileBrowser:
             utils = mobileBrowser.utils
             Login(mobileBrowser, args).login()
             if startingPoints is None:
-                startingPoints = utils.getAccountPoints()
+                startingPoints = runState["startingPoints"] = utils.getAccountPoints()
             ReadToEarn(mobileBrowser).completeReadToEarn()
             with Searches(mobileBrowser) as searches:
                 searches.bingSearches()
 
-            goalPoints = utils.getGoalPoints()
-            goalTitle = utils.getGoalTitle()
+            dashboard = utils.getDashboardData()
+            goalPoints = utils.getGoalPoints(dashboard)
+            goalTitle = utils.getGoalTitle(dashboard)
 
             remainingSearches = mobileBrowser.getRemainingSearches(
-                desktopAndMobile=True
+                desktopAndMobile=True, dashboard=dashboard
             )
-            accountPoints = utils.getAccountPoints()
+            accountPoints = utils.getAccountPoints(dashboard)
 
-    logging.info(
-        f"[POINTS] You have earned {formatNumber(accountPoints - startingPoints)} points this run !"
-    )
-    logging.info(f"[POINTS] You are now at {formatNumber(accountPoints)} points !")
-    appriseSummary = AppriseSummary[CONFIG.get("apprise").get("summary")]
-    if appriseSummary == AppriseSummary.ALWAYS:
+    pointsEarned = formatNumber(accountPoints - startingPoints)
+    totalPoints = formatNumber(accountPoints)
+    logging.info(f"[POINTS] You have earned {pointsEarned} points this run !")
+    logging.info(f"[POINTS] You are now at {totalPoints} points !")
+    if APPRISE_SUMMARY is AppriseSummary.NEVER:
+        return accountPoints
+
+    if APPRISE_SUMMARY is AppriseSummary.ALWAYS:
         goalStatus = ""
         if goalPoints > 0:
+            goalPercentage = formatNumber((accountPoints / goalPoints) * 100)
             logging.info(
-                f"[POINTS] You are now at {(formatNumber((accountPoints / goalPoints) * 100))}% of your "
-                f"goal ({goalTitle}) !"
-            )
-            goalStatus = (
-                f"🎯 Goal reached: {(formatNumber((accountPoints / goalPoints) * 100))}%"
-                f" ({goalTitle})"
+                f"[POINTS] You are now at {goalPercentage}% of your goal ({goalTitle}) !"
             )
+            goalStatus = f"🎯 Goal reached: {goalPercentage}% ({goalTitle})"
 
         sendNotification(
             "Daily Points Update",
             "\n".join(
                 [
                     f"👤 Account: {currentAccount.username}",
-                    f"⭐️ Points earned today: {formatNumber(accountPoints - startingPoints)}",
-                    f"💰 Total points: {formatNumber(accountPoints)}",
+                    f"⭐️ Points earned today: {pointsEarned}",
+                    f"💰 Total points: {totalPoints}",
                     goalStatus,
                 ]
             ),
         )
-    elif appriseSummary == AppriseSummary.ON_ERROR:
+    elif APPRISE_SUMMARY is AppriseSummary.ON_ERROR:
         if remainingSearches.getTotal() > 0:
             sendNotification(
                 "Error: remaining searches",
                 f"account username: {currentAccount.username}, {remainingSearches}",
             )
-    elif appriseSummary == AppriseSummary.NEVER:
-        pass
 
     return accountPoints
 
 
 def export_points_to_csv(points_data):
-    logs_directory = getProjectRoot() / "logs"
-    csv_filename = logs_directory / "points_data.csv"
-    with open(csv_filename, mode="a", newline="") as file:  # Use "a" mode for append
+    with open(POINTS_CSV_PATH, mode="a", newline="") as file:  # Use "a" mode for append
         fieldnames = ["Account", "Earned Points", "Points Difference"]
         writer = csv.DictWriter(file, fieldnames=fieldnames)
 
@@ -374,17 +497,20 @@ def export_points_to_csv(points_data):
 # Define a function to load the previous day's points data from a file in the "logs" folder
 def load_previous_points_data():
     try:
-        with open(getProjectRoot() / "logs" / "previous_points_data.json", "r") as file:
-            return json.load(file)
+        return json.loads(PREVIOUS_POINTS_PATH.read_bytes())
     except FileNotFoundError:
         return {}
 
 
 # Define a function to save the current day's points data for the next day in the "logs" folder
 def save_previous_points_data(data):
-    logs_directory = getProjectRoot() / "logs"
-    with open(logs_directory / "previous_points_data.json", "w") as file:
-        json.dump(data, file, indent=4)
+    # write to a temporary file first so an interrupted save can't truncate the data
+    temporaryPath = PREVIOUS_POINTS_PATH.with_suffix(".json.tmp")
+    with open(temporaryPath, "w", encoding="utf-8") as file:
+        file.write(json.dumps(data, indent=4))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporaryPath, PREVIOUS_POINTS_PATH)
 
 def time_left(sleep_time, step=60):
     for _ in range(sleep_time, 0, (-1)*step):
@@ -394,6 +520,8 @@ def time_left(sleep_time, step=60):
     
 def createDisplay():
     """Create Display"""
+    from pyvirtualdisplay import Display
+
     try:
         display = Display(visible=False, size=(1920, 1080))
         display.start()
@@ -407,9 +535,7 @@ def job():
         main()
     except Exception as e:
         logging.exception("")
-        sendNotification(
-            "⚠️ Error occurred, please check the log", traceback.format_exc(), e
-        )
+        sendNotification("⚠️ Error occurred, please check the log", e=e)
 
 if __name__ == "__main__":
     # downloadWebDriver()
@@ -420,3 +546,6 @@ if __name__ == "__main__":
     schedule.every().days.at(time_str = "11:00", tz = "America/New_York").do(job)
     while True:
         schedule.run_pending()
+        # sleep until the next job is due instead of spinning, re-checking
+        # at least once a minute in case the wall clock jumps
+        time.sleep(min(max(schedule.idle_seconds(), 0), 60))
@@ -1,14 +1,26 @@
 #!/bin/bash
 
+# Writes stdin to the given file, leaving it untouched when nothing changed.
+# The file is rewritten in place so it keeps its inode and permissions.
+write_if_changed() {
+  local tmp
+  tmp=$(mktemp)  # created 0600, the content may hold passwords
+  cat > "$tmp"
+  if ! cmp -s "$tmp" "$1"; then
+    cat "$tmp" > "$1"
+  fi
+  rm -f "$tmp"
+}
+
 # Makes accounts.json
 
-cat > /app/accounts.json <<EOF
+write_if_changed /app/accounts.json <<EOF
 ${ACCOUNTS}
 EOF
 
 
 # Makes config.yaml
-cat > /app/config-private.yaml <<EOF
+write_if_changed /app/config-private.yaml <<EOF
 # config-private.yaml
 apprise:
   urls:
@@ -1,11 +1,10 @@
 import contextlib
 import logging
-from random import randint
-from time import sleep
+from random import randint, uniform
+from time import monotonic, sleep
 
 from selenium.common import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 
 from src.browser import Browser
 from src.constants import REWARDS_URL
@@ -36,6 +35,9 @@ ACTIVITY_TITLE_TO_SEARCH = {
     "Who won?": "braves score",
     "You can track your package": "usps tracking",
 }
+INCOMPLETE_ACTIVITY_IGNORE = frozenset(
+    CONFIG.get("apprise").get("notify").get("incomplete-activity").get("ignore") or ()
+)
 
 
 class Activities:
@@ -72,27 +74,22 @@ class Activities:
         # noinspection SpellCheckingInspection
         self.webdriver.find_element(By.ID, f"btoption{randint(0, 1)}").click()
         
-    def waitUntilQuizLoads(self):
-        """Wait until quiz loads"""
-        tries = 0
-        refreshCount = 0
-        while True:
-            try:
-                self.webdriver.find_element(
-                    By.XPATH, '//*[@id="currentQuestionContainer"]')
-                return True
-            except:
-                if tries < 10:
-                    tries += 1
-                    sleep(0.5)
-                else:
-                    if refreshCount < 5:
-                        self.webdriver.refresh()
-                        refreshCount += 1
-                        tries = 0
-                        sleep(5)
-                    else:
-                        return False
+    def waitUntilQuizLoads(self) -> bool:
+        """Wait until quiz loads, refreshing the page up to 5 times if it doesn't"""
+        for refreshCount in range(6):
+            if refreshCount:
+                self.webdriver.refresh()
+            # poll quickly at first then back off with jitter, up to 4s between polls
+            deadline = monotonic() + 10
+            delay = 0.1
+            while True:
+                if self.webdriver.find_elements(By.ID, "currentQuestionContainer"):
+                    return True
+                if monotonic() >= deadline:
+                    break
+                sleep(uniform(0, delay))
+                delay = min(delay * 2, 4)
+        return False
 
     def completeQuiz(self):
         # Simulate completing a quiz activity
@@ -109,24 +106,20 @@ class Activities:
         self.browser.utils.waitUntilVisible(
             By.XPATH, '//*[@id="currentQuestionContainer"]/div/div[1]', 180
         )
-        currentQuestionNumber: int = self.webdriver.execute_script(
-            "return _w.rewardsQuizRenderInfo.currentQuestionNumber"
-        )
-        maxQuestions = self.webdriver.execute_script(
-            "return _w.rewardsQuizRenderInfo.maxQuestions"
-        )
-        numberOfOptions = self.webdriver.execute_script(
-            "return _w.rewardsQuizRenderInfo.numberOfOptions"
+        # Read the quiz state in a single round trip
+        currentQuestionNumber, maxQuestions, numberOfOptions = self.webdriver.execute_script(
+            "const info = _w.rewardsQuizRenderInfo;"
+            " return [info.currentQuestionNumber, info.maxQuestions, info.numberOfOptions]"
         )
         for _ in range(currentQuestionNumber, maxQuestions + 1):
             if numberOfOptions == 8:
-                answers = []
-                for i in range(numberOfOptions):
-                    isCorrectOption = self.webdriver.find_element(
-                        By.ID, f"rqAnswerOption{i}"
-                    ).get_attribute("iscorrectoption")
-                    if isCorrectOption and isCorrectOption.lower() == "true":
-                        answers.append(f"rqAnswerOption{i}")
+                answers = [
+                    f"rqAnswerOption{i}"
+                    for i, (isCorrectOption, _) in enumerate(
+                        self.getAnswerOptions(numberOfOptions)
+                    )
+                    if isCorrectOption and isCorrectOption.lower() == "true"
+                ]
                 for answer in answers:
                     element = self.webdriver.find_element(By.ID, answer)
                     self.browser.utils.click(element)
@@ -135,13 +128,10 @@ class Activities:
                 correctOption = self.webdriver.execute_script(
                     "return _w.rewardsQuizRenderInfo.correctAnswer"
                 )
-                for i in range(numberOfOptions):
-                    if (
-                        self.webdriver.find_element(
-                            By.ID, f"rqAnswerOption{i}"
-                        ).get_attribute("data-option")
-                        == correctOption
-                    ):
+                for i, (_, answerTitle) in enumerate(
+                    self.getAnswerOptions(numberOfOptions)
+                ):
+                    if answerTitle == correctOption:
                         element = self.webdriver.find_element(
                             By.ID, f"rqAnswerOption{i}"
                         )
@@ -150,6 +140,18 @@ class Activities:
                         self.browser.utils.waitUntilQuestionRefresh()
                         break
 
+    def getAnswerOptions(self, numberOfOptions: int) -> list[list[str | None]]:
+        # Read the iscorrectoption and data-option attributes of every answer in one round trip
+        return self.webdriver.execute_script(
+            """
+            return Array.from({length: arguments[0]}, (_, i) => {
+                const option = document.getElementById("rqAnswerOption" + i);
+                return [option.getAttribute("iscorrectoption"), option.getAttribute("data-option")];
+            });
+            """,
+            numberOfOptions,
+        )
+
     def completeABC(self):
         # Simulate completing an ABC activity
         counter = self.webdriver.find_element(
@@ -181,45 +183,39 @@ class Activities:
             By.XPATH, '//*[@id="currentQuestionContainer"]/div/div[1]', 180
         )
         sleep(randint(10, 15))
+        # the encode key doesn't change while answering, only fetch it once per page load
+        answerEncodeKey = self.webdriver.execute_script("return _G.IG")
         for _ in range(10):
-            correctAnswerCode = self.webdriver.execute_script(
-                "return _w.rewardsQuizRenderInfo.correctAnswer"
+            # Read the correct answer and both options in a single round trip
+            correctAnswerCode, answer1Title, answer2Title = self.webdriver.execute_script(
+                """
+                return [
+                    _w.rewardsQuizRenderInfo.correctAnswer,
+                    document.getElementById("rqAnswerOption0").getAttribute("data-option"),
+                    document.getElementById("rqAnswerOption1").getAttribute("data-option"),
+                ];
+                """
             )
-            answer1, answer1Code = self.getAnswerAndCode("rqAnswerOption0")
-            answer2, answer2Code = self.getAnswerAndCode("rqAnswerOption1")
-            answerToClick: WebElement
-            if answer1Code == correctAnswerCode:
-                answerToClick = answer1
-            elif answer2Code == correctAnswerCode:
-                answerToClick = answer2
+            answerToClick: str
+            if getAnswerCode(answerEncodeKey, answer1Title) == correctAnswerCode:
+                answerToClick = "rqAnswerOption0"
+            elif getAnswerCode(answerEncodeKey, answer2Title) == correctAnswerCode:
+                answerToClick = "rqAnswerOption1"
 
-            self.browser.utils.click(answerToClick)
+            self.browser.utils.click(self.webdriver.find_element(By.ID, answerToClick))
             sleep(randint(10, 15))
 
-    def getAnswerAndCode(self, answerId: str) -> tuple[WebElement, str]:
-        # Helper function to get answer element and its code
-        answerEncodeKey = self.webdriver.execute_script("return _G.IG")
-        answer = self.webdriver.find_element(By.ID, answerId)
-        answerTitle = answer.get_attribute("data-option")
-        return (
-            answer,
-            getAnswerCode(answerEncodeKey, answerTitle),
-        )
-
-    def doActivity(self, activity: dict, activities: list[dict]) -> None:
+    def doActivity(self, activity: dict, cardId: int) -> None:
         try:
             activityTitle = cleanupActivityTitle(activity["title"])
             logging.debug(f"activityTitle={activityTitle}")
             if activity["complete"] is True or activity["pointProgressMax"] == 0 or activity["exclusiveLockedFeatureStatus"] == "locked":
                 logging.debug("Already done, returning")
                 return
-            if activityTitle in CONFIG.get("apprise").get("notify").get(
-                "incomplete-activity"
-            ).get("ignore"):
+            if activityTitle in INCOMPLETE_ACTIVITY_IGNORE:
                 logging.debug(f"Ignoring {activityTitle}")
                 return
             # Open the activity for the activity
-            cardId = activities.index(activity)
             isDailySet = (
                 "daily_set_date" in activity["attributes"]
                 and activity["attributes"]["daily_set_date"]
@@ -273,15 +269,15 @@ class Activities:
         logging.info("[DAILY SET] " + "Trying to complete the Daily Set...")
         dailySetPromotions = self.browser.utils.getDailySetPromotions()
         self.browser.utils.goToRewards()
-        for activity in dailySetPromotions:
-            self.doActivity(activity, dailySetPromotions)
+        for cardId, activity in enumerate(dailySetPromotions):
+            self.doActivity(activity, cardId)
         logging.info("[DAILY SET] Done")
 
         logging.info("[MORE PROMOS] " + "Trying to complete More Promotions...")
         morePromotions: list[dict] = self.browser.utils.getMorePromotions()
         self.browser.utils.goToRewards()
-        for activity in morePromotions:
-            self.doActivity(activity, morePromotions)
+        for cardId, activity in enumerate(morePromotions):
+            self.doActivity(activity, cardId)
         logging.info("[MORE PROMOS] Done")
 
         # todo Send one email for all accounts?
@@ -293,22 +289,17 @@ class Activities:
             .get("enabled")
         ):
             incompleteActivities: dict[str, tuple[str, str, str]] = {}
-            for activity in (
-                self.browser.utils.getDailySetPromotions()
-                + self.browser.utils.getMorePromotions()
-            ):  # Have to refresh
+            dashboard = self.browser.utils.getDashboardData()  # Have to refresh
+            for activity in self.browser.utils.getDailySetPromotions(
+                dashboard
+            ) + self.browser.utils.getMorePromotions(dashboard):
                 if activity["pointProgress"] < activity["pointProgressMax"]:
                     incompleteActivities[cleanupActivityTitle(activity["title"])] = (
                         activity["promotionType"],
                         activity["pointProgress"],
                         activity["pointProgressMax"],
                     )
-            for incompleteActivityToIgnore in (
-                CONFIG.get("apprise")
-                .get("notify")
-                .get("incomplete-activity")
-                .get("ignore")
-            ):
+            for incompleteActivityToIgnore in INCOMPLETE_ACTIVITY_IGNORE:
                 incompleteActivities.pop(incompleteActivityToIgnore, None)
             if incompleteActivities:
                 logging.info(f"incompleteActivities: {incompleteActivities}")
@@ -318,5 +309,9 @@ class Activities:
                 )
 
 
+# drop zero-width spaces and turn non-breaking spaces into regular ones
+ACTIVITY_TITLE_CLEANUP = str.maketrans({"\u200b": None, "\xa0": " "})
+
+
 def cleanupActivityTitle(activityTitle: str) -> str:
-    return activityTitle.replace("\u200b", "").replace("\xa0", " ")
\ No newline at end of file
+    return activityTitle.translate(ACTIVITY_TITLE_CLEANUP)
\ No newline at end of file
@@ -15,8 +15,6 @@ import undetected_chromedriver
 from ipapi.exceptions import RateLimited
 from selenium.webdriver import ChromeOptions
 from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.common.by import By
 
 from src import Account, RemainingSearches
 from src.userAgentGenerator import GenerateUserAgent
@@ -77,6 +75,19 @@ class Browser:
         self.webdriver.close()
         self.webdriver.quit()
 
+    @staticmethod
+    def getDriverExecutablePath() -> str:
+        return "/usr/bin/chromedriver" if os.environ.get("DOCKER") else "chromedriver"
+
+    @staticmethod
+    def patchDriver() -> None:
+        """Patches the shared chrome driver binary once, before any browser starts."""
+        # undetected_chromedriver rewrites an unpatched binary in place when Chrome starts,
+        # parallel workers doing that at the same time race on the same file
+        undetected_chromedriver.Patcher(
+            executable_path=Browser.getDriverExecutablePath()
+        ).auto()
+
     def browserSetup(
         self,
     ) -> undetected_chromedriver.Chrome:
@@ -121,18 +132,14 @@ class Browser:
                 options=options,
                 seleniumwire_options=seleniumwireOptions,
                 user_data_dir=self.userDataDir.as_posix(),
-                driver_executable_path="/usr/bin/chromedriver",
+                driver_executable_path=Browser.getDriverExecutablePath(),
             )
         else:
-            # Obtain webdriver chrome driver version
-            version = self.getChromeVersion()
-            major = int(version.split(".")[0])
-
             driver = webdriver.Chrome(
                 options=options,
                 seleniumwire_options=seleniumwireOptions,
                 user_data_dir=self.userDataDir.as_posix(),
-                driver_executable_path="chromedriver",
+                driver_executable_path=Browser.getDriverExecutablePath(),
                 # version_main=112,
             )
 
@@ -281,10 +288,10 @@ class Browser:
         return version
 
     def getRemainingSearches(
-        self, desktopAndMobile: bool = False
+        self, desktopAndMobile: bool = False, dashboard: dict | None = None
     ) -> RemainingSearches | int:
         # bingInfo = self.utils.getBingInfo()
-        bingInfo = self.utils.getDashboardData()
+        bingInfo = dashboard or self.utils.getDashboardData()
         searchPoints = 1
         counters = bingInfo["userStatus"]["counters"]
         pcSearch: dict = counters["pcSearch"][0]
@@ -1,4 +1,5 @@
 import random
+from functools import cache
 from typing import Any
 
 import requests
@@ -129,14 +130,16 @@ class GenerateUserAgent:
             "chrome_reduced_version": chromeReducedVersion,
         }
 
-    def getEdgeVersions(self) -> tuple[str, str]:
+    @staticmethod
+    @cache
+    def getEdgeVersions() -> tuple[str, str]:
         """
-        Get the latest version of Microsoft Edge.
+        Get the latest version of Microsoft Edge, fetched once per process.
 
         Returns:
             str: The latest version of Microsoft Edge.
         """
-        response = self.getWebdriverPage(
+        response = GenerateUserAgent.getWebdriverPage(
             "https://edgeupdates.microsoft.com/api/products"
         )
 
@@ -181,14 +184,16 @@ class GenerateUserAgent:
                 )
         raise HTTPError("Failed to get Edge versions.")
 
-    def getChromeVersion(self) -> str:
+    @staticmethod
+    @cache
+    def getChromeVersion() -> str:
         """
-        Get the latest version of Google Chrome.
+        Get the latest version of Google Chrome, fetched once per process.
 
         Returns:
             str: The latest version of Google Chrome.
         """
-        response = self.getWebdriverPage(
+        response = GenerateUserAgent.getWebdriverPage(
             "https://googlechromelabs.github.io/chrome-for-testing/last-known-good-versions.json"
         )
         data = response.json()
@@ -4,8 +4,10 @@ import locale as pylocale
 import logging
 import re
 import time
+import traceback
 from argparse import Namespace
 from datetime import date
+from functools import cache
 from pathlib import Path
 from types import MappingProxyType
 from typing import Any
@@ -150,13 +152,13 @@ class Utils:
                 except TimeoutException:
                     self.goToRewards()
 
-    def getDailySetPromotions(self) -> list[dict]:
-        return self.getDashboardData()["dailySetPromotions"][
+    def getDailySetPromotions(self, dashboard: dict | None = None) -> list[dict]:
+        return (dashboard or self.getDashboardData())["dailySetPromotions"][
             date.today().strftime("%m/%d/%Y")
         ]
 
-    def getMorePromotions(self) -> list[dict]:
-        return self.getDashboardData()["morePromotions"]
+    def getMorePromotions(self, dashboard: dict | None = None) -> list[dict]:
+        return (dashboard or self.getDashboardData())["morePromotions"]
 
     # Not reliable
     def getBingInfo(self) -> Any:
@@ -185,14 +187,19 @@ class Utils:
             return True
         return False
 
-    def getAccountPoints(self) -> int:
-        return self.getDashboardData()["userStatus"]["availablePoints"]
+    # Pass an already fetched dashboard to avoid another round trip to the rewards page
+    def getAccountPoints(self, dashboard: dict | None = None) -> int:
+        return (dashboard or self.getDashboardData())["userStatus"]["availablePoints"]
 
-    def getGoalPoints(self) -> int:
-        return self.getDashboardData()["userStatus"]["redeemGoal"]["price"]
+    def getGoalPoints(self, dashboard: dict | None = None) -> int:
+        return (dashboard or self.getDashboardData())["userStatus"]["redeemGoal"][
+            "price"
+        ]
 
-    def getGoalTitle(self) -> str:
-        return self.getDashboardData()["userStatus"]["redeemGoal"]["title"]
+    def getGoalTitle(self, dashboard: dict | None = None) -> str:
+        return (dashboard or self.getDashboardData())["userStatus"]["redeemGoal"][
+            "title"
+        ]
 
     def tryDismissAllMessages(self) -> None:
         byValues = [
@@ -245,6 +252,7 @@ class Utils:
             element.click()
 
 
+@cache
 def getProjectRoot() -> Path:
     return Path(__file__).parent.parent
 
@@ -273,7 +281,8 @@ def loadPrivateConfig() -> MappingProxyType:
     return loadConfig("config-private.yaml", DEFAULT_PRIVATE_CONFIG)
 
 
-def sendNotification(title: str, body: str, e: Exception = None) -> None:
+def sendNotification(title: str, body: str | None = None, e: Exception = None) -> None:
+    # without a body the traceback of e is sent, formatted only if we actually notify
     if Utils.args.disable_apprise or (
         e
         and not CONFIG.get("apprise")
@@ -287,6 +296,8 @@ def sendNotification(title: str, body: str, e: Exception = None) -> None:
     if not urls:
         logging.debug("No urls found, not sending notification")
         return
+    if body is None:
+        body = "".join(traceback.format_exception(e))
     for url in urls:
         apprise.add(url)
     assert apprise.notify(title=str(title), body=str(body)) # not work for telegram
@@ -316,8 +327,8 @@ def saveBrowserConfig(sessionPath: Path, config: dict) -> None:
         json.dump(config, f)
 
 
-def makeRequestsSession(session: Session = requests.session()) -> Session:
-    retry = Retry(
+RETRY_ADAPTER = HTTPAdapter(
+    max_retries=Retry(
         total=5,
         backoff_factor=1,
         status_forcelist=[
@@ -327,12 +338,15 @@ def makeRequestsSession(session: Session = requests.session()) -> Session:
             504,
         ],  # todo Use global retries from config
     )
-    session.mount(
-        "https://", HTTPAdapter(max_retries=retry)
-    )  # See https://stackoverflow.com/a/35504626/4164390 to finetune
-    session.mount(
-        "http://", HTTPAdapter(max_retries=retry)
-    )  # See https://stackoverflow.com/a/35504626/4164390 to finetune
+)  # See https://stackoverflow.com/a/35504626/4164390 to finetune
+
+
+def makeRequestsSession(session: Session = requests.session()) -> Session:
+    # mounting a fresh adapter on every call would throw away the pooled connections
+    # of the shared default session, so only mount when it isn't there yet
+    if session.get_adapter("https://") is not RETRY_ADAPTER:
+        session.mount("https://", RETRY_ADAPTER)
+        session.mount("http://", RETRY_ADAPTER)
     return session
 
 